@@ -1,18 +1,23 @@
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
+import grpc
+import httpx
 from fastapi import FastAPI, Request, HTTPException
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import Distance, VectorParams
 from qdrant_client.http import models
+from qdrant_client.http.exceptions import ResponseHandlingException
+
+from core.config import settings
 
 from llm.base import BaseLLM
 from llm.gemini import GeminiLLM
 from llm.local import LocalLLM
+from repo.database import QdrantRepository
 import time
 
 # TODO: use env vars
-QDRANT_URL      = "http://localhost:6333"
 COLLECTION_NAME = "rag_chunks"
 VECTOR_SIZE     = 768
 DISTANCE        = Distance.COSINE
@@ -25,7 +30,19 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
    Create singletons once, close them on shutdown.
    """
    try:
-      qc = AsyncQdrantClient(url=QDRANT_URL)
+      qc = AsyncQdrantClient(
+         host=settings.qdrant_host,
+         port=settings.qdrant_port,
+         grpc_port=settings.qdrant_grpc_port,
+         prefer_grpc=settings.qdrant_prefer_grpc,
+         timeout=settings.qdrant_timeout,
+         # httpx pool for REST requests (the transport when prefer_grpc=False);
+         # the gRPC channel multiplexes over one connection and ignores it
+         limits=httpx.Limits(
+            max_connections=settings.qdrant_rest_pool_size,
+            max_keepalive_connections=settings.qdrant_rest_pool_size,
+         ),
+      )
       if not await qc.collection_exists(COLLECTION_NAME):
          await qc.create_collection(
                collection_name=COLLECTION_NAME,
@@ -51,8 +68,10 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
                      wal_segments_ahead=0       # No segments ahead
                )
          )
+      # Collections created before structured payloads existed need their indexes too
+      await QdrantRepository(qc).create_payload_indexes()
 
-   except ResponseHandlingException as e:
+   except (ResponseHandlingException, grpc.RpcError) as e:
       # 3. Handle the specific Qdrant connection error
       # This will catch the 'All connection attempts failed' error
       print("="*60)
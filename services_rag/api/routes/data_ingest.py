@@ -1,8 +1,9 @@
 # api/data/
 from fastapi import APIRouter
-from utils.helpers import transform_dict_to_text_chunk, transform_doc_id_to_url
+from utils.helpers import transform_dict_to_text_chunk, transform_doc_id_to_url, build_service_payload
 from utils.vectorize import embed_text
 from utils.data_loader import load_services_from_google_doc
+from utils.hierarchy import build_hierarchy_chunks
 from api.dependency import QdrantRepoDep
 
 router = APIRouter()
@@ -32,10 +33,13 @@ async def ingest_data(url: str, qdrant_repo: QdrantRepoDep):
 async def embed_and_store(chunks: list[dict], qdrant_repo: QdrantRepoDep):
     await qdrant_repo.clear_collection()
     text_and_vectors = []
-    for chunk in chunks:
-        text = transform_dict_to_text_chunk(chunk)
+    payloads = []
+    # Service records plus parent summary chunks, linked through chunk_id/parent_id
+    for record, links in build_hierarchy_chunks(chunks):
+        text = transform_dict_to_text_chunk(record)
         embedding = embed_text(text)
         text_and_vectors.append((text, embedding))
+        payloads.append({**build_service_payload(record), **links})
     
-    await qdrant_repo.bulk_insert_points(text_and_vectors)
+    await qdrant_repo.bulk_insert_points(text_and_vectors, payloads)
     return True
\ No newline at end of file
@@ -1,15 +1,38 @@
 # api/rag/
-from fastapi import APIRouter
+from typing import Annotated, Optional
+from fastapi import APIRouter, Query
 from api.dependency import QdrantRepoDep, LLMDep
 from utils.vectorize import embed_text
+from rag.retrieval import retrieve_chunks
+from llm.prompts import build_rag_prompt
 router = APIRouter()
 
 @router.get("/")
-async def ask_question(q: str, qdrant_repo: QdrantRepoDep, llm_client: LLMDep):
+async def ask_question(
+    q: str,
+    qdrant_repo: QdrantRepoDep,
+    llm_client: LLMDep,
+    hnsw_ef: Annotated[Optional[int], Query(ge=1)] = None,
+    exact: Optional[bool] = None,
+    score_threshold: Annotated[Optional[float], Query(ge=-1.0, le=1.0)] = None,  # cosine similarity range
+    institution: Optional[str] = None,  # institution name, case-insensitive
+    service: Optional[str] = None,      # top-level service name, case-insensitive
+    collapse: bool = True,
+):
     query_vector = embed_text(q, True)
-    relevant_docs = await qdrant_repo.search_points(query_vector, limit=5)
+    relevant_docs = await retrieve_chunks(
+        qdrant_repo,
+        query_vector,
+        limit=5,
+        collapse=collapse,
+        hnsw_ef=hnsw_ef,
+        exact=exact,
+        score_threshold=score_threshold,
+        institution=institution,
+        top_level_service=service,
+    )
     print("\n".join(f'{x.payload["text"]} {x.score}' for x in relevant_docs))
     relevant_text = '\n'.join([ x.payload["text"] for x in relevant_docs])
-    response_text = llm_client.generate(q, relevant_text)
-    return {"message": response_text}
+    response = llm_client.complete(build_rag_prompt(q, relevant_text))
+    return {"message": response.text, "usage": response.usage}
 
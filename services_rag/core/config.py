@@ -13,6 +13,17 @@ class Settings(BaseSettings):
     # Vector DB
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
+    qdrant_grpc_port: int = 6334
+    qdrant_prefer_grpc: bool = True     # gRPC avoids JSON (de)serialization of vectors/payloads
+    qdrant_timeout: int = 10            # seconds
+    # Max pooled HTTP connections. Only applies to requests sent over REST (all of them
+    # when qdrant_prefer_grpc=False); gRPC multiplexes requests over a single channel.
+    qdrant_rest_pool_size: int = 20
+
+    # Search defaults (overridable per request)
+    search_hnsw_ef: int | None = None   # None -> use the collection's ef
+    search_exact: bool = False
+    search_score_threshold: float | None = None
 
     # Tell Pydantic where to find your .env
     model_config = SettingsConfigDict(env_file="../.env", env_file_encoding="utf-8")
@@ -1,7 +1,32 @@
 # llm/base.py
 from abc import ABC, abstractmethod
 
+from pydantic import BaseModel, computed_field
+
+from .prompts import Prompt, build_rag_prompt
+
+
+class LLMUsage(BaseModel):
+    prompt_tokens: int = 0
+    cached_tokens: int = 0   # prompt tokens served from a provider/prefix cache
+    output_tokens: int = 0
+
+    @computed_field
+    @property
+    def fresh_tokens(self) -> int:
+        """Prompt tokens that had to be prefilled from scratch."""
+        return self.prompt_tokens - self.cached_tokens
+
+
+class LLMResponse(BaseModel):
+    text: str
+    usage: LLMUsage
+
+
 class BaseLLM(ABC):
-    @abstractmethod
     def generate(self, q: str, relevant_document: str) -> str:
+        return self.complete(build_rag_prompt(q, relevant_document)).text
+
+    @abstractmethod
+    def complete(self, prompt: Prompt) -> LLMResponse:
         pass
@@ -0,0 +1,41 @@
+# llm/fake.py
+import os
+from typing import List
+
+from .base import BaseLLM, LLMResponse, LLMUsage
+from .prompts import Prompt
+
+
+class FakeLLM(BaseLLM):
+    """
+    Offline provider that simulates a prefix (KV) cache.
+
+    Tokens are whitespace-separated words; a prompt's cached tokens are the ones
+    it shares as a leading prefix with the previous prompt. Use it to check that
+    prompt construction keeps the prefix stable across requests.
+    """
+
+    def __init__(self, reply: str = "fake answer"):
+        self.reply = reply
+        self.prompts: List[Prompt] = []
+
+    @property
+    def prefix_is_stable(self) -> bool:
+        """True when every prompt seen so far had the same prefix."""
+        return len({prompt.prefix for prompt in self.prompts}) <= 1
+
+    def complete(self, prompt: Prompt) -> LLMResponse:
+        tokens = prompt.text.split()
+        cached_tokens = 0
+        if self.prompts:
+            cached_tokens = len(os.path.commonprefix([self.prompts[-1].text.split(), tokens]))
+
+        self.prompts.append(prompt)
+        return LLMResponse(
+            text=self.reply,
+            usage=LLMUsage(
+                prompt_tokens=len(tokens),
+                cached_tokens=cached_tokens,
+                output_tokens=len(self.reply.split()),
+            ),
+        )
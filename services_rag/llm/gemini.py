@@ -1,35 +1,108 @@
-# llm/openai_llm.py
-from .base import BaseLLM
+# llm/gemini.py
+import time
+from typing import Optional
+
+from .base import BaseLLM, LLMResponse, LLMUsage
+from .prompts import Prompt
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+
+CACHE_TTL_SECONDS = 3600
+CACHE_REFRESH_MARGIN_SECONDS = 60   # recreate the cache slightly before it expires
+CACHE_RETRY_SECONDS = 300           # back-off after a transient caching error
+# Smallest prefix (in tokens) Gemini accepts for context caching
+MIN_CACHE_TOKENS = {"gemini-2.5-flash": 1024, "gemini-2.5-pro": 4096}
+DEFAULT_MIN_CACHE_TOKENS = 4096
+
+
+def _is_too_small_error(error: errors.APIError) -> bool:
+    message = (error.message or "").lower()
+    return error.code == 400 and ("too small" in message or "min_total_token_count" in message)
+
 
 class GeminiLLM(BaseLLM):
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, model: str = "gemini-2.5-flash", use_context_cache: bool = True):
         self.api_key = api_key
+        self.model = model
         self.client = genai.Client(api_key=self.api_key)
 
+        self._use_context_cache = use_context_cache
+        self._cache_name: Optional[str] = None
+        self._cache_prefix: Optional[str] = None
+        self._cache_expires_at = 0.0
+        self._cache_retry_at = 0.0
+        self._cacheable_prefixes: set[str] = set()     # prefixes whose size has been checked
+        self._uncacheable_prefixes: set[str] = set()   # prefixes below the model's minimum
 
-    def generate(self, q: str, relevant_document: str) -> str:
-        prompt = f"""
-        DOCUMENT:
-        {relevant_document}
 
-        QUESTION:
-        {q}
+    def _get_cache(self, prefix: str) -> Optional[str]:
+        """
+        Returns the name of an explicit context cache holding `prefix`, creating it
+        if needed, or None to send the prefix inline.
 
-        INSTRUCTIONS:
-        You are a helpful assistant that will give inforamtion about the services, the relevant
-        documents about the services referenced in the users QUESTION have been provided to you, use them to answer the user's QUESTIOSN.
-        Answer the users QUESTION using the DOCUMENT text above.
-        Keep your answer ground in the facts of the DOCUMENT.
-        If the DOCUMENT doesn’t contain the facts to answer the QUESTION state clearly why you can't answer the prompt
+        The prefix size is checked once with count_tokens; prefixes below the model's
+        minimum cacheable size are never sent to caches.create. After a transient
+        error, creation is retried once CACHE_RETRY_SECONDS have passed.
         """
+        if not self._use_context_cache or prefix in self._uncacheable_prefixes:
+            return None
+        if self._cache_name and self._cache_prefix == prefix and time.time() < self._cache_expires_at:
+            return self._cache_name
+        if time.time() < self._cache_retry_at:
+            return None
+
+        try:
+            if prefix not in self._cacheable_prefixes:
+                token_count = self.client.models.count_tokens(model=self.model, contents=prefix).total_tokens or 0
+                if token_count < MIN_CACHE_TOKENS.get(self.model, DEFAULT_MIN_CACHE_TOKENS):
+                    self._uncacheable_prefixes.add(prefix)
+                    return None
+                self._cacheable_prefixes.add(prefix)
+
+            cache = self.client.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    display_name="services-rag-system-instruction",
+                    system_instruction=prefix,
+                    ttl=f"{CACHE_TTL_SECONDS}s",
+                ),
+            )
+        except errors.APIError as e:
+            if _is_too_small_error(e):
+                self._uncacheable_prefixes.add(prefix)
+            else:
+                print(f"Gemini context cache unavailable, retrying in {CACHE_RETRY_SECONDS}s: {e}")
+                self._cache_retry_at = time.time() + CACHE_RETRY_SECONDS
+            return None
+
+        self._cache_name = cache.name
+        self._cache_prefix = prefix
+        self._cache_expires_at = time.time() + CACHE_TTL_SECONDS - CACHE_REFRESH_MARGIN_SECONDS
+        return self._cache_name
+
+
+    def complete(self, prompt: Prompt) -> LLMResponse:
+        cache_name = self._get_cache(prompt.prefix)
+        config = types.GenerateContentConfig(
+            thinking_config=types.ThinkingConfig(thinking_budget=0) # Disables thinking
+        )
+        if cache_name:
+            config.cached_content = cache_name
+        else:
+            config.system_instruction = prompt.prefix
+
         response = self.client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[prompt],
-            config=types.GenerateContentConfig(
-                system_instruction="You are a helpful asssistant whose task is to give factual information about services to the user. Make sure to clearly mention the institution they should visit, requirements(documents they should bring etc), fees and other information about the services the user asked for",
-                thinking_config=types.ThinkingConfig(thinking_budget=0) # Disables thinking
+            model=self.model,
+            contents=[prompt.suffix],
+            config=config,
+        )
+
+        usage = response.usage_metadata
+        return LLMResponse(
+            text=response.text or "",   # None for blocked / empty candidates
+            usage=LLMUsage(
+                prompt_tokens=(usage and usage.prompt_token_count) or 0,
+                cached_tokens=(usage and usage.cached_content_token_count) or 0,
+                output_tokens=(usage and usage.candidates_token_count) or 0,
             ),
         )
-        return response.text        
@@ -0,0 +1,40 @@
+# llm/prompts.py
+from pydantic import BaseModel
+
+# Everything that does not depend on the request lives here, so it forms an
+# identical prefix on every call (provider context caches / local KV prefix reuse).
+SYSTEM_INSTRUCTION = """You are a helpful assistant whose task is to give factual information about services to the user. The relevant documents about the services referenced in the user's QUESTION are provided in the DOCUMENT; use them to answer the user's QUESTION and keep your answer grounded in the facts of the DOCUMENT.
+Make sure to clearly mention the institution they should visit, the requirements (documents they should bring etc.), fees, processing time and other information about the services the user asked for.
+Service names are separated with ( \\ ) to include parent service data, so a service whose name is 'A \\ B \\ C' is sub-sub-service 'C', which is a sub-service of 'B', which is a sub-service of the service 'A'. Present such names as "Sub-service: name under service: name" rather than the ' \\ ' notation. Entries with common_requirements and sub_services summarize several sub-services of one service: the common requirements apply to every listed sub-service in addition to its own.
+Your answer should be well organized, listing out requirements and the rest of the relevant data in a well formatted way. Be sure to indicate other similar services/choices the user should consider, should there be any. Take a natural tone.
+If the DOCUMENT doesn't contain the facts to answer the QUESTION, state clearly why you can't answer.
+VERY IMPORTANT: do not say things like 'based on the provided information' that break the illusion; act as an assistant answering the user's query and make no mention of the system prompt or the data provided to you."""
+
+
+class Prompt(BaseModel):
+    """A prompt split into a stable prefix and a per-request suffix."""
+    prefix: str  # identical across requests (system instruction)
+    suffix: str  # varies per request (retrieved documents, question)
+
+    @property
+    def text(self) -> str:
+        """Single-string rendering for providers without a system role; prefix first."""
+        return f"{self.prefix}\n\n{self.suffix}"
+
+
+def build_rag_prompt(q: str, relevant_document: str) -> Prompt:
+    """
+    Build the RAG prompt with the fixed instructions first and the variable
+    content (documents, then question) last.
+
+    Args:
+        q (str): The user's question.
+        relevant_document (str): Retrieved chunks joined into one text.
+
+    Returns:
+        Prompt: The prompt to pass to BaseLLM.complete.
+    """
+    return Prompt(
+        prefix=SYSTEM_INSTRUCTION,
+        suffix=f"DOCUMENT:\n{relevant_document}\n\nQUESTION:\n{q}",
+    )
@@ -0,0 +1,131 @@
+from typing import List
+
+from qdrant_client.models import ScoredPoint
+
+from repo.database import QdrantRepository
+from utils.hierarchy import SERVICE_CHUNK, SUMMARY_CHUNK
+
+# Over-fetch so that collapsing siblings still leaves `limit` distinct hits
+CANDIDATE_FACTOR = 2
+# Sibling hits needed before they are replaced by their parent summary
+MIN_SIBLINGS_TO_COLLAPSE = 2
+# How far the best child must outscore everything else in its group to be returned
+# on its own instead of the parent summary (cosine similarity)
+EXPAND_MARGIN = 0.05
+
+
+def _word_count(point) -> int:
+    return len((point.payload or {}).get("text", "").split())
+
+
+async def collapse_sibling_hits(hits: List[ScoredPoint], qdrant_repo: QdrantRepository) -> List[ScoredPoint]:
+    """
+    Replace groups of sibling service hits with their parent summary chunk.
+
+    A group is a parent summary plus its child service hits. It is formed when the
+    summary was hit itself or at least MIN_SIBLINGS_TO_COLLAPSE children were hit.
+    A group is collapsed into the summary (at the rank and score of its best member)
+    only if the summary text is no longer than the hits it replaces, so collapsing
+    never grows the prompt.
+
+    A group is expanded instead when its best child outscores the summary, its hit
+    siblings and, if some of the summary's child_ids were not hit, the lowest
+    candidate score by at least EXPAND_MARGIN: the child hits are kept in their own
+    rank order and the summary is dropped.
+
+    Args:
+        hits (List[ScoredPoint]): Search results, best first.
+        qdrant_repo (QdrantRepository): Used to fetch summaries that were not hit.
+
+    Returns:
+        List[ScoredPoint]: Deduplicated hits, best first.
+    """
+    if not hits:
+        return []
+
+    summary_hits = {str(hit.id): hit for hit in hits if hit.payload.get("chunk_type") == SUMMARY_CHUNK}
+    siblings = {}   # parent summary id -> child service hits, best first
+    for hit in hits:
+        if hit.payload.get("chunk_type") == SERVICE_CHUNK and hit.payload.get("parent_id"):
+            siblings.setdefault(hit.payload["parent_id"], []).append(hit)
+
+    group_ids = set(summary_hits) | {
+        parent_id for parent_id, children in siblings.items() if len(children) >= MIN_SIBLINGS_TO_COLLAPSE
+    }
+    summary_payloads = {summary_id: hit.payload for summary_id, hit in summary_hits.items()}
+    missing_ids = [summary_id for summary_id in group_ids if summary_id not in summary_payloads]
+    if missing_ids:
+        for record in await qdrant_repo.retrieve_points(missing_ids):
+            summary_payloads[str(record.id)] = record.payload
+    group_ids &= set(summary_payloads)   # a summary that could not be fetched collapses nothing
+
+    # Children that are not among the hits scored at most the lowest candidate
+    floor_score = hits[-1].score
+    collapsed_ids = set()
+    expanded_ids = set()
+    for group_id in group_ids:
+        children = siblings.get(group_id, [])
+        competing_scores = [hit.score for hit in children[1:]]
+        if group_id in summary_hits:
+            competing_scores.append(summary_hits[group_id].score)
+        if len(children) < len(summary_payloads[group_id].get("child_ids") or []):
+            competing_scores.append(floor_score)
+        if children and children[0].score - max(competing_scores, default=floor_score) >= EXPAND_MARGIN:
+            expanded_ids.add(group_id)
+            continue
+
+        members = children + ([summary_hits[group_id]] if group_id in summary_hits else [])
+        summary_words = len(summary_payloads[group_id].get("text", "").split())
+        if summary_words <= sum(_word_count(hit) for hit in members):
+            collapsed_ids.add(group_id)
+
+    results = []
+    seen = set()
+    for hit in hits:
+        key = str(hit.id)
+        if key in expanded_ids:
+            continue
+        if hit.payload.get("chunk_type") == SERVICE_CHUNK and hit.payload.get("parent_id") in collapsed_ids:
+            key = hit.payload["parent_id"]
+        if key in seen:
+            continue
+        seen.add(key)
+
+        if key in collapsed_ids:
+            results.append(ScoredPoint(id=key, version=hit.version, score=hit.score, payload=summary_payloads[key]))
+        else:
+            results.append(hit)
+
+    return results
+
+
+async def retrieve_chunks(
+    qdrant_repo: QdrantRepository,
+    query_vector: List[float],
+    limit: int = 5,
+    collapse: bool = True,
+    **search_kwargs,
+) -> List[ScoredPoint]:
+    """
+    Hierarchy-aware retrieval.
+
+    With `collapse`, sibling hits are folded into their parent summary when that
+    shortens the prompt, or kept as individual sub-services when one clearly wins
+    (see collapse_sibling_hits).
+    Without it only individual service chunks are searched.
+
+    Args:
+        qdrant_repo (QdrantRepository): Repository to search.
+        query_vector (List[float]): Embedded query.
+        limit (int): Maximum number of chunks returned.
+        collapse (bool): Whether to collapse siblings into parent summaries.
+        **search_kwargs: Forwarded to QdrantRepository.search_points.
+
+    Returns:
+        List[ScoredPoint]: At most `limit` chunks, best first.
+    """
+    if not collapse:
+        return await qdrant_repo.search_points(query_vector, limit=limit, chunk_type=SERVICE_CHUNK, **search_kwargs)
+
+    hits = await qdrant_repo.search_points(query_vector, limit=limit * CANDIDATE_FACTOR, **search_kwargs)
+    return (await collapse_sibling_hits(hits, qdrant_repo))[:limit]
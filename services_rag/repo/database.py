@@ -5,10 +5,22 @@ from qdrant_client.http import models
 
 from fastapi import HTTPException
 import uuid
+
+from core.config import settings
+from utils.helpers import normalize_filter_value
 # TODO: Use Env vars
 QDRANT_URL = "http://localhost:6333"
 COLLECTION_NAME = "rag_chunks"
 VECTOR_SIZE = 768
+# Only the fields the RAG prompt needs; avoids shipping the whole payload on every hit
+DEFAULT_PAYLOAD_FIELDS = ["text", "chunk_type", "parent_id", "child_ids"]
+# Structured payload fields that get a Qdrant payload index (used for filtered search)
+PAYLOAD_INDEXES = {
+    "institution_key": models.PayloadSchemaType.KEYWORD,
+    "top_level_service_key": models.PayloadSchemaType.KEYWORD,
+    "chunk_type": models.PayloadSchemaType.KEYWORD,
+    "parent_id": models.PayloadSchemaType.KEYWORD,
+}
 
 class QdrantRepository:
     """
@@ -46,15 +58,28 @@ class QdrantRepository:
         )
         return {"status": "success", "message": f"Point {vector_id} inserted/updated."}
 
-    async def bulk_insert_points(self, text_vector_tuples: List[Tuple[str, List[float]]]) -> dict:
-        """Inserts or updates multiple vector points along with their payloads."""
+    async def bulk_insert_points(
+        self,
+        text_vector_tuples: List[Tuple[str, List[float]]],
+        payloads: Optional[List[dict]] = None,
+    ) -> dict:
+        """
+        Inserts or updates multiple vector points along with their payloads.
+
+        `payloads`, if given, holds the structured fields stored next to each text
+        (same order as `text_vector_tuples`). A "chunk_id" entry is used as the point
+        id instead of a random one, so other payloads can link to it.
+        """
+        if payloads is not None and len(payloads) != len(text_vector_tuples):
+            raise HTTPException(status_code=400, detail="Number of payloads must match number of points.")
+
         points = []
-        for text, vector in text_vector_tuples:
+        for i, (text, vector) in enumerate(text_vector_tuples):
             if len(vector) != self.vector_size:
                 raise HTTPException(status_code=400, detail=f"Vector size must be {self.vector_size}.")
                 
-            vector_id = str(uuid.uuid4())
-            payload = {"text": text.replace(".. ", ". ")}
+            payload = {**(payloads[i] if payloads else {}), "text": text.replace(".. ", ". ")}
+            vector_id = payload.pop("chunk_id", None) or str(uuid.uuid4())
             points.append(
                 PointStruct(
                     id=vector_id,
@@ -70,19 +95,89 @@ class QdrantRepository:
         )
         return {"status": "success", "message": f"{len(points)} points inserted/updated."}
 
-    async def search_points(self, query_vector: List[float], limit: int = 1) -> List[ScoredPoint]:
-        """Performs a vector similarity search."""
+    async def search_points(
+        self,
+        query_vector: List[float],
+        limit: int = 1,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+        score_threshold: Optional[float] = None,
+        payload_fields: Optional[List[str]] = None,
+        institution: Optional[str] = None,
+        top_level_service: Optional[str] = None,
+        chunk_type: Optional[str] = None,
+    ) -> List[ScoredPoint]:
+        """
+        Performs a vector similarity search.
+
+        Search params not given fall back to the defaults in settings. Only the
+        payload keys in `payload_fields` are returned (DEFAULT_PAYLOAD_FIELDS if None).
+        `institution` / `top_level_service` / `chunk_type` restrict the candidates via
+        the payload indexes before vector scoring; institution and service names are
+        matched case-insensitively (see normalize_filter_value).
+        """
         if len(query_vector) != self.vector_size:
             raise HTTPException(status_code=400, detail=f"Query vector size must be {self.vector_size}.")
-            
-        print(query_vector)
-        search_result = await self.client.search(
+
+        search_params = models.SearchParams(
+            hnsw_ef=hnsw_ef if hnsw_ef is not None else settings.search_hnsw_ef,
+            exact=exact if exact is not None else settings.search_exact,
+        )
+        response = await self.client.query_points(
             collection_name=self.collection_name,
-            query_vector=query_vector,
+            query=query_vector,
+            query_filter=self._build_filter(institution, top_level_service, chunk_type),
             limit=limit,
-            with_payload=True # Retrieve the original data (payload)
+            search_params=search_params,
+            score_threshold=score_threshold if score_threshold is not None else settings.search_score_threshold,
+            with_payload=payload_fields or DEFAULT_PAYLOAD_FIELDS,
+            with_vectors=False,
         )
-        return search_result
+        return response.points
+
+    @staticmethod
+    def _build_filter(
+        institution: Optional[str],
+        top_level_service: Optional[str],
+        chunk_type: Optional[str] = None,
+    ) -> Optional[Filter]:
+        """Builds a payload filter on the normalized name keys, or None when nothing is filtered."""
+        conditions = []
+        if institution:
+            conditions.append(models.FieldCondition(
+                key="institution_key", match=models.MatchValue(value=normalize_filter_value(institution))
+            ))
+        if top_level_service:
+            conditions.append(models.FieldCondition(
+                key="top_level_service_key", match=models.MatchValue(value=normalize_filter_value(top_level_service))
+            ))
+        if chunk_type:
+            conditions.append(models.FieldCondition(key="chunk_type", match=models.MatchValue(value=chunk_type)))
+
+        return Filter(must=conditions) if conditions else None
+
+    async def retrieve_points(self, vector_ids: List[str], payload_fields: Optional[List[str]] = None) -> List[models.Record]:
+        """Fetches points by ID (without vectors)."""
+        if not vector_ids:
+            return []
+
+        return await self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=vector_ids,
+            with_payload=payload_fields or DEFAULT_PAYLOAD_FIELDS,
+            with_vectors=False,
+        )
+
+    async def create_payload_indexes(self) -> dict:
+        """Creates the payload indexes used by filtered search (no-op for existing ones)."""
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            await self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+                wait=True
+            )
+        return {"status": "success", "message": f"{len(PAYLOAD_INDEXES)} payload indexes created."}
 
     async def delete_point(self, vector_id: str) -> dict:
         """Deletes a single point by ID."""
@@ -133,5 +228,6 @@ class QdrantRepository:
         )
         )
         print(f"Recreated collection: {self.collection_name}")
+        await self.create_payload_indexes()
         
         return {"status": "success", "message": "Collection cleared and recreated."}
\ No newline at end of file
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+from google.genai import errors
+
+from llm import gemini
+from llm.gemini import GeminiLLM
+from llm.prompts import build_rag_prompt
+
+
+class StubModels:
+    def __init__(self, token_count):
+        self.token_count = token_count
+        self.count_calls = 0
+        self.generate_configs = []
+
+    def count_tokens(self, model, contents):
+        self.count_calls += 1
+        return SimpleNamespace(total_tokens=self.token_count)
+
+    def generate_content(self, model, contents, config):
+        self.generate_configs.append(config)
+        usage = SimpleNamespace(prompt_token_count=1200, cached_content_token_count=1100, candidates_token_count=20)
+        return SimpleNamespace(text=None, usage_metadata=usage)
+
+
+class StubCaches:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.create_calls = 0
+
+    def create(self, model, config):
+        self.create_calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(name=outcome)
+
+
+def make_llm(token_count, *cache_outcomes):
+    llm = GeminiLLM("test-key")
+    llm.client = SimpleNamespace(models=StubModels(token_count), caches=StubCaches(*cache_outcomes))
+    return llm
+
+
+def api_error(code, message):
+    error_class = errors.ClientError if code < 500 else errors.ServerError
+    return error_class(code, {"error": {"code": code, "message": message, "status": "ERROR"}})
+
+
+def test_small_prefix_is_never_cached():
+    llm = make_llm(330)
+    prompt = build_rag_prompt("q", "doc")
+
+    llm.complete(prompt)
+    llm.complete(prompt)
+
+    assert llm.client.models.count_calls == 1
+    assert llm.client.caches.create_calls == 0
+    config = llm.client.models.generate_configs[-1]
+    assert config.system_instruction == prompt.prefix
+    assert config.cached_content is None
+
+
+def test_large_prefix_uses_cache_and_reports_usage():
+    llm = make_llm(2000, "cachedContents/abc")
+
+    response = llm.complete(build_rag_prompt("q", "doc"))
+    llm.complete(build_rag_prompt("other q", "other doc"))
+
+    assert llm.client.caches.create_calls == 1
+    config = llm.client.models.generate_configs[-1]
+    assert config.cached_content == "cachedContents/abc"
+    assert config.system_instruction is None
+    assert response.text == ""
+    assert response.usage.cached_tokens == 1100
+    assert response.usage.fresh_tokens == 100
+
+
+def test_transient_error_retries_later(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gemini.time, "time", lambda: now[0])
+    llm = make_llm(2000, api_error(503, "Service unavailable"), "cachedContents/abc")
+    prompt = build_rag_prompt("q", "doc")
+
+    assert llm._get_cache(prompt.prefix) is None
+    assert llm._get_cache(prompt.prefix) is None
+    assert llm.client.caches.create_calls == 1
+
+    now[0] += gemini.CACHE_RETRY_SECONDS
+    assert llm._get_cache(prompt.prefix) == "cachedContents/abc"
+
+
+def test_too_small_error_disables_cache_for_prefix():
+    llm = make_llm(2000, api_error(400, "Cached content is too small. min_total_token_count=4096"))
+    prompt = build_rag_prompt("q", "doc")
+
+    assert llm._get_cache(prompt.prefix) is None
+    assert llm._get_cache(prompt.prefix) is None
+    assert llm.client.caches.create_calls == 1
@@ -0,0 +1,133 @@
+from utils.helpers import transform_dict_to_text_chunk
+from utils.hierarchy import (
+    MAX_SUMMARY_WORDS,
+    SERVICE_CHUNK,
+    SUMMARY_CHUNK,
+    build_hierarchy_chunks,
+    build_service_tree,
+    make_chunk_id,
+)
+
+
+def service(name, requirements="", fee="", processing_time="", other=None, institution="Immigration"):
+    record = {
+        "service_name": name,
+        "institution_name": institution,
+        "requirements": requirements,
+        "processing_time": processing_time,
+        "fee": fee,
+    }
+    if other:
+        record["other"] = other
+    return record
+
+
+def by_name(chunks):
+    return {(record["service_name"], links["chunk_type"]): (record, links) for record, links in chunks}
+
+
+def test_make_chunk_id_is_deterministic():
+    first = make_chunk_id("Immigration", "Passport \\ New", SERVICE_CHUNK)
+    assert first == make_chunk_id("Immigration", "Passport \\ New", SERVICE_CHUNK)
+    assert first != make_chunk_id("Immigration", "Passport \\ New", SUMMARY_CHUNK)
+    assert first != make_chunk_id("Immigration", "Passport \\ New", SERVICE_CHUNK, 1)
+    assert first != make_chunk_id("Transport", "Passport \\ New", SERVICE_CHUNK)
+
+
+def test_build_service_tree_groups_by_institution_and_path():
+    trees = build_service_tree([
+        service("Passport \\ New"),
+        service("Passport \\ Renewal"),
+        service("Licence", institution="Transport"),
+    ])
+
+    assert set(trees) == {"Immigration", "Transport"}
+    passport = trees["Immigration"]["children"]["Passport"]
+    assert passport["records"] == []
+    assert passport["path"] == ("Passport",)
+    assert set(passport["children"]) == {"New", "Renewal"}
+    assert passport["children"]["New"]["path"] == ("Passport", "New")
+
+
+def test_summary_links_children_and_keeps_every_fact():
+    services = [
+        service("Passport \\ New", "ID, photo, birth certificate", fee="100", other=["Apply in person"]),
+        service("Passport \\ Renewal", "ID, photo, old passport", fee="80", processing_time="5 days"),
+        service("Passport \\ Renewal", "ID, photo, police report", fee="120"),
+        service("Visa", "passport", fee="50"),
+    ]
+    chunks = by_name(build_hierarchy_chunks(services))
+
+    summary, summary_links = chunks[("Passport", SUMMARY_CHUNK)]
+    assert summary_links["parent_id"] is None
+    assert summary_links["child_ids"] == [
+        make_chunk_id("Immigration", "Passport \\ New", SERVICE_CHUNK),
+        make_chunk_id("Immigration", "Passport \\ Renewal", SERVICE_CHUNK, 0),
+        make_chunk_id("Immigration", "Passport \\ Renewal", SERVICE_CHUNK, 1),
+    ]
+    assert summary["common_requirements"] == "ID, photo"
+
+    text = transform_dict_to_text_chunk(summary)
+    for fact in ["birth certificate", "Apply in person", "old passport", "5 days", "police report", "100", "80", "120"]:
+        assert fact in text
+
+    _, new_links = chunks[("Passport \\ New", SERVICE_CHUNK)]
+    assert new_links["chunk_id"] == summary_links["child_ids"][0]
+    assert new_links["parent_id"] == summary_links["chunk_id"]
+
+    _, visa_links = chunks[("Visa", SERVICE_CHUNK)]
+    assert visa_links["parent_id"] is None
+    assert ("Visa", SUMMARY_CHUNK) not in chunks
+
+
+def test_nested_summaries_link_to_parent_summary():
+    services = [
+        service("Passport", "ID"),
+        service("Passport \\ Renewal", "ID, old passport"),
+        service("Passport \\ Renewal \\ Lost", "ID, police report"),
+        service("Passport \\ Renewal \\ Expired", "ID, expired passport"),
+    ]
+    chunks = by_name(build_hierarchy_chunks(services))
+
+    # "Passport" has a single sub-service record, so it gets no summary
+    assert ("Passport", SUMMARY_CHUNK) not in chunks
+
+    _, renewal_summary = chunks[("Passport \\ Renewal", SUMMARY_CHUNK)]
+    _, renewal = chunks[("Passport \\ Renewal", SERVICE_CHUNK)]
+    _, lost = chunks[("Passport \\ Renewal \\ Lost", SERVICE_CHUNK)]
+    assert renewal["parent_id"] is None
+    assert lost["parent_id"] == renewal_summary["chunk_id"]
+
+    services += [service("Passport \\ New", "ID, birth certificate")]
+    chunks = by_name(build_hierarchy_chunks(services))
+    _, passport_summary = chunks[("Passport", SUMMARY_CHUNK)]
+    _, renewal_summary = chunks[("Passport \\ Renewal", SUMMARY_CHUNK)]
+    assert renewal_summary["parent_id"] == passport_summary["chunk_id"]
+
+
+def test_large_parent_is_split_into_capped_summaries():
+    services = [
+        service(
+            f"Passport \\ Type {i}",
+            f"national ID card, two passport photos, birth certificate, form P{i}",
+            fee=f"{100 + i * 10} birr",
+            processing_time=f"{i + 3} working days",
+            other=[f"Apply at window {i}"],
+        )
+        for i in range(12)
+    ]
+    chunks = build_hierarchy_chunks(services)
+    summaries = [(record, links) for record, links in chunks if links["chunk_type"] == SUMMARY_CHUNK]
+
+    assert len(summaries) > 1
+    assert len({links["chunk_id"] for _, links in summaries}) == len(summaries)
+    for record, links in summaries:
+        assert len(transform_dict_to_text_chunk(record).split()) <= MAX_SUMMARY_WORDS
+        assert len(links["child_ids"]) >= 2
+
+    covered = [child_id for _, links in summaries for child_id in links["child_ids"]]
+    assert len(covered) == len(set(covered))
+    for record, links in chunks:
+        if links["chunk_type"] == SERVICE_CHUNK and links["chunk_id"] in covered:
+            summary_links = next(l for _, l in summaries if links["chunk_id"] in l["child_ids"])
+            assert links["parent_id"] == summary_links["chunk_id"]
@@ -0,0 +1,32 @@
+from llm.fake import FakeLLM
+from llm.prompts import SYSTEM_INSTRUCTION, build_rag_prompt
+
+
+def test_prompt_puts_stable_prefix_first():
+    prompt = build_rag_prompt("How do I renew my passport?", "service_name: Passport \\ Renewal.")
+
+    assert prompt.prefix == SYSTEM_INSTRUCTION
+    assert prompt.text.startswith(SYSTEM_INSTRUCTION)
+    assert prompt.text.index("DOCUMENT:") < prompt.text.index("QUESTION:")
+
+
+def test_fake_provider_reuses_whole_prefix_across_requests():
+    llm = FakeLLM()
+    first = llm.complete(build_rag_prompt("How do I renew my passport?", "service_name: Passport \\ Renewal. fee: 80"))
+    second = llm.complete(build_rag_prompt("What does a visa cost?", "service_name: Visa. fee: 50"))
+
+    prefix_tokens = len(SYSTEM_INSTRUCTION.split())
+    assert first.usage.cached_tokens == 0
+    assert second.usage.cached_tokens >= prefix_tokens
+    assert 0 < second.usage.fresh_tokens < second.usage.prompt_tokens
+    assert llm.prefix_is_stable
+
+
+def test_fake_provider_detects_unstable_prefix():
+    llm = FakeLLM()
+    prompt = build_rag_prompt("q", "doc")
+    llm.complete(prompt)
+    llm.complete(prompt.model_copy(update={"prefix": f"Today is Monday. {prompt.prefix}"}))
+
+    assert not llm.prefix_is_stable
+    assert llm.complete(prompt).usage.cached_tokens < len(prompt.prefix.split())
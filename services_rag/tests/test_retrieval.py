@@ -0,0 +1,123 @@
+import asyncio
+
+from qdrant_client.models import Record, ScoredPoint
+
+from rag.retrieval import EXPAND_MARGIN, collapse_sibling_hits
+from utils.hierarchy import SERVICE_CHUNK, SUMMARY_CHUNK
+
+SUMMARY_ID = "00000000-0000-0000-0000-000000000001"
+CHILD_IDS = [f"00000000-0000-0000-0000-00000000001{i}" for i in range(3)]
+OTHER_ID = "00000000-0000-0000-0000-000000000099"
+
+SUMMARY_PAYLOAD = {"text": "Passport summary", "chunk_type": SUMMARY_CHUNK, "parent_id": None, "child_ids": CHILD_IDS}
+
+
+class StubRepo:
+    """Stands in for QdrantRepository.retrieve_points, backed by a dict of payloads."""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.requested = []
+
+    async def retrieve_points(self, vector_ids, payload_fields=None):
+        self.requested.append(list(vector_ids))
+        return [Record(id=vector_id, payload=self.payloads[vector_id]) for vector_id in vector_ids if vector_id in self.payloads]
+
+
+def child(index, score):
+    payload = {"text": f"child {index}", "chunk_type": SERVICE_CHUNK, "parent_id": SUMMARY_ID, "child_ids": []}
+    return ScoredPoint(id=CHILD_IDS[index], version=1, score=score, payload=payload)
+
+
+def other(score):
+    payload = {"text": "Visa", "chunk_type": SERVICE_CHUNK, "parent_id": None, "child_ids": []}
+    return ScoredPoint(id=OTHER_ID, version=1, score=score, payload=payload)
+
+
+def summary(score):
+    return ScoredPoint(id=SUMMARY_ID, version=1, score=score, payload=SUMMARY_PAYLOAD)
+
+
+def collapse(hits, repo):
+    return asyncio.run(collapse_sibling_hits(hits, repo))
+
+
+def test_siblings_collapse_into_fetched_summary():
+    repo = StubRepo({SUMMARY_ID: SUMMARY_PAYLOAD})
+    results = collapse([child(0, 0.90), other(0.89), child(1, 0.88), child(2, 0.87)], repo)
+
+    assert repo.requested == [[SUMMARY_ID]]
+    assert [str(hit.id) for hit in results] == [SUMMARY_ID, OTHER_ID]
+    assert results[0].score == 0.90
+    assert results[0].payload["text"] == "Passport summary"
+
+
+def test_summary_hit_absorbs_children_without_fetching():
+    repo = StubRepo({})
+    results = collapse([other(0.95), child(1, 0.90), summary(0.89)], repo)
+
+    assert repo.requested == []
+    assert [str(hit.id) for hit in results] == [OTHER_ID, SUMMARY_ID]
+    assert results[1].score == 0.90
+
+
+def test_single_child_hit_is_left_alone():
+    repo = StubRepo({SUMMARY_ID: SUMMARY_PAYLOAD})
+    hits = [child(0, 0.90), other(0.80)]
+
+    assert collapse(hits, repo) == hits
+
+
+def test_dominant_child_expands_group_and_drops_summary():
+    repo = StubRepo({})
+    hits = [child(0, 0.90), summary(0.90 - 2 * EXPAND_MARGIN), child(1, 0.70), child(2, 0.70)]
+    results = collapse(hits, repo)
+
+    assert [str(hit.id) for hit in results] == [CHILD_IDS[0], CHILD_IDS[1], CHILD_IDS[2]]
+    assert [hit.score for hit in results] == [0.90, 0.70, 0.70]
+
+
+def test_expansion_keeps_siblings_in_rank_order():
+    two_children = {**SUMMARY_PAYLOAD, "child_ids": CHILD_IDS[:2]}
+    repo = StubRepo({SUMMARY_ID: two_children})
+    results = collapse([child(0, 0.95), child(1, 0.80), other(0.79)], repo)
+
+    assert [str(hit.id) for hit in results] == [CHILD_IDS[0], CHILD_IDS[1], OTHER_ID]
+
+
+def test_missing_children_count_at_lowest_candidate_score():
+    # Children 1 and 2 were not hit, so they may score up to 0.87 (the last candidate)
+    repo = StubRepo({})
+    results = collapse([child(0, 0.90), summary(0.80), other(0.87)], repo)
+
+    assert [str(hit.id) for hit in results] == [SUMMARY_ID, OTHER_ID]
+
+
+def test_summary_longer_than_sibling_hits_is_not_used():
+    long_summary = {**SUMMARY_PAYLOAD, "text": " ".join(["word"] * 50)}
+    repo = StubRepo({SUMMARY_ID: long_summary})
+    hits = [child(0, 0.90), child(1, 0.88), other(0.87)]
+
+    assert collapse(hits, repo) == hits
+
+
+def test_collapsed_result_is_never_longer_than_hits():
+    long_summary = {**SUMMARY_PAYLOAD, "text": " ".join(["word"] * 5)}
+    cases = [
+        [child(0, 0.90), child(1, 0.88), child(2, 0.87)],
+        [child(0, 0.90), other(0.89), child(1, 0.88)],
+        [summary(0.91), child(0, 0.90), child(1, 0.88)],
+        [child(0, 0.99), child(1, 0.80), other(0.70), child(2, 0.60)],
+    ]
+    for hits in cases:
+        for payload in (SUMMARY_PAYLOAD, long_summary):
+            results = collapse(hits, StubRepo({SUMMARY_ID: payload}))
+            words = lambda points: sum(len(point.payload["text"].split()) for point in points)
+            assert words(results) <= words(hits)
+
+
+def test_unfetchable_summary_keeps_children():
+    repo = StubRepo({})
+    hits = [child(0, 0.90), child(1, 0.88)]
+
+    assert collapse(hits, repo) == hits
@@ -12,13 +12,60 @@ def transform_dict_to_text_chunk(data: dict) -> str:
     lines = []
     if "service_name" in data:
         lines.append(f"service_name: {data['service_name']}.")
-        data.pop("service_name")
-        
+
     for key, value in data.items():
+        if key == "service_name":
+            continue
         lines.append(f"{key}: {value}")
-        
+
     return ". ".join(lines).strip()
 
+
+def build_service_payload(data: dict) -> dict:
+    """
+    Extract the structured, filterable fields of a service record.
+
+    The service hierarchy is encoded in `service_name` as 'A \\ B \\ C'.
+
+    Args:
+        data (dict): Dictionary containing service attributes.
+
+    Returns:
+        dict: institution_name, service_name, top_level_service and depth
+              (1 for a top-level service, 2 for its sub-services, ...), plus
+              institution_key / top_level_service_key, the normalized values
+              that filtered search matches against.
+    """
+    service_name = data.get("service_name", "")
+    hierarchy = [part.strip() for part in service_name.split(" \\ ") if part.strip()]
+
+    institution_name = data.get("institution_name", "")
+    top_level_service = hierarchy[0] if hierarchy else ""
+
+    return {
+        "institution_name": institution_name,
+        "service_name": service_name,
+        "top_level_service": top_level_service,
+        "depth": len(hierarchy),
+        "institution_key": normalize_filter_value(institution_name),
+        "top_level_service_key": normalize_filter_value(top_level_service),
+    }
+
+
+def normalize_filter_value(value: str) -> str:
+    """
+    Normalize a name used for payload filtering, so that matching ignores case
+    and extra whitespace.
+
+    Args:
+        value (str): Institution or service name.
+
+    Returns:
+        str: Case-folded value with whitespace collapsed.
+    """
+    return " ".join(value.split()).casefold()
+
+
 def transform_doc_id_to_url(doc_id: str) -> str:
     """
     Transform a Google Doc ID into a full URL.
@@ -0,0 +1,203 @@
+import re
+import uuid
+from typing import List, Dict, Tuple, Optional
+
+from utils.helpers import transform_dict_to_text_chunk
+
+# Chunk types stored in the point payload
+SERVICE_CHUNK = "service"
+SUMMARY_CHUNK = "summary"
+
+# A parent only gets a summary chunk when at least this many sub-services have records
+MIN_CHILDREN_FOR_SUMMARY = 2
+# Upper bound on a summary chunk's text (whitespace words); keeps summaries well inside
+# the embedding model's 512-token input and small enough to be worth collapsing into.
+# Parents whose sub-services do not fit get several summary chunks.
+MAX_SUMMARY_WORDS = 120
+
+HIERARCHY_SEPARATOR = " \\ "
+
+# Record keys a summary states once (in its own header / common_requirements) rather than per sub-service
+SUMMARY_SHARED_KEYS = {"service_name", "institution_name", "requirements"}
+
+
+def make_chunk_id(institution_name: str, service_name: str, chunk_type: str, index: int = 0) -> str:
+    """
+    Build a deterministic point id, so parent/child links survive re-ingestion.
+
+    Args:
+        institution_name (str): Institution offering the service.
+        service_name (str): Full ' \\ ' separated service name.
+        chunk_type (str): SERVICE_CHUNK or SUMMARY_CHUNK.
+        index (int): Position among records sharing the same service name.
+
+    Returns:
+        str: UUID string usable as a Qdrant point id.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{institution_name}|{service_name}|{chunk_type}|{index}"))
+
+
+def build_service_tree(services: List[Dict]) -> Dict[str, Dict]:
+    """
+    Arrange parsed service records into one hierarchy tree per institution.
+
+    Every node is a dict with 'name', 'path' (tuple of names from the top-level
+    service down), 'records' (the parsed service dicts with that name, empty when the
+    service only exists as a parent) and 'children' (name -> node).
+
+    Args:
+        services (List[Dict]): Service dictionaries as returned by parse_services.
+
+    Returns:
+        Dict[str, Dict]: Institution name -> root node (root has an empty path).
+    """
+    trees = {}
+    for service in services:
+        institution = service.get("institution_name", "")
+        path = [part.strip() for part in service.get("service_name", "").split(HIERARCHY_SEPARATOR.strip())]
+        path = [part for part in path if part]
+        if not path:
+            continue
+
+        node = trees.setdefault(institution, {"name": institution, "path": (), "records": [], "children": {}})
+        for depth, name in enumerate(path, 1):
+            node = node["children"].setdefault(
+                name, {"name": name, "path": tuple(path[:depth]), "records": [], "children": {}}
+            )
+        node["records"].append(service)
+
+    return trees
+
+
+def _split_requirements(requirements: str) -> List[str]:
+    return [item.strip().rstrip(".") for item in re.split(r"[,;]", requirements or "") if item.strip().rstrip(".")]
+
+
+def _format_value(value) -> str:
+    return ", ".join(value) if isinstance(value, list) else str(value)
+
+
+def _common_requirement_keys(records: List[Dict]) -> set:
+    """Lower-cased requirement items shared by every record."""
+    return set.intersection(*[
+        {item.lower() for item in _split_requirements(record.get("requirements", ""))} for record in records
+    ])
+
+
+def _describe_sub_service(name: str, record: Dict, common_keys: set) -> str:
+    """One summary entry: the sub-service name and only what it does not share with its siblings."""
+    details = []
+    specific = [item for item in _split_requirements(record.get("requirements", "")) if item.lower() not in common_keys]
+    if specific:
+        details.append(f"requirements: {', '.join(specific)}")
+    for key, value in record.items():
+        if key in SUMMARY_SHARED_KEYS or not value:
+            continue
+        details.append(f"{key}: {_format_value(value)}")
+    return f"{name} ({'; '.join(details)})" if details else name
+
+
+def _summarize_children(institution: str, node: Dict, children: List[Dict], common_keys: set) -> Dict:
+    """
+    Build a summary record for `node` covering every record of the given sub-services.
+
+    Requirements in `common_keys` are listed once; everything else (remaining
+    requirements, fee, processing time, other notes, ...) is kept per record, so the
+    summary can stand in for the sub-service chunks without losing facts.
+    """
+    records = [(child["name"], record) for child in children for record in child["records"]]
+    first_requirements = _split_requirements(records[0][1].get("requirements", ""))
+    common = [item for item in first_requirements if item.lower() in common_keys]
+
+    summary = {
+        "service_name": HIERARCHY_SEPARATOR.join(node["path"]),
+        "institution_name": institution,
+    }
+    if common:
+        summary["common_requirements"] = ", ".join(common)
+    summary["sub_services"] = " | ".join(
+        _describe_sub_service(name, record, common_keys) for name, record in records
+    )
+    return summary
+
+
+def _word_count(record: Dict) -> int:
+    return len(transform_dict_to_text_chunk(record).split())
+
+
+def _partition_children(institution: str, node: Dict, children: List[Dict], common_keys: set) -> List[List[Dict]]:
+    """
+    Split sub-services into groups whose summary stays within MAX_SUMMARY_WORDS.
+
+    A sub-service (with all records sharing its name) is never split across groups.
+    Groups with fewer than MIN_CHILDREN_FOR_SUMMARY sub-services are dropped: there
+    is nothing to condense, and a sub-service too large to share a group gets none.
+    """
+    groups = [[]]
+    for child in children:
+        candidate = groups[-1] + [child]
+        if groups[-1] and _word_count(_summarize_children(institution, node, candidate, common_keys)) > MAX_SUMMARY_WORDS:
+            groups.append([child])
+        else:
+            groups[-1] = candidate
+
+    return [
+        group for group in groups
+        if len(group) >= MIN_CHILDREN_FOR_SUMMARY
+        and _word_count(_summarize_children(institution, node, group, common_keys)) <= MAX_SUMMARY_WORDS
+    ]
+
+
+def build_hierarchy_chunks(services: List[Dict]) -> List[Tuple[Dict, Dict]]:
+    """
+    Produce the chunks to index: every parsed service record plus summary chunks
+    for parent services with enough sub-service records (one per group of
+    sub-services that fits in MAX_SUMMARY_WORDS).
+
+    Args:
+        services (List[Dict]): Service dictionaries as returned by parse_services.
+
+    Returns:
+        List[Tuple[Dict, Dict]]: (record, links) pairs. `record` is the dict to turn
+        into chunk text; `links` holds chunk_id, chunk_type, parent_id and child_ids
+        for the point payload. parent_id points at the summary chunk that covers the
+        record (for a summary chunk: the one covering its service's own record), or
+        None; child_ids lists the service chunks a summary covers.
+    """
+    chunks = []
+
+    def visit(institution: str, node: Dict, parent_summary_id: Optional[str]) -> None:
+        children = [child for child in node["children"].values() if child["records"]]
+        covering_summary_ids = {}   # child name -> id of the summary chunk covering it
+        if node["path"] and len(children) >= MIN_CHILDREN_FOR_SUMMARY:
+            common_keys = _common_requirement_keys([record for child in children for record in child["records"]])
+            for part, group in enumerate(_partition_children(institution, node, children, common_keys)):
+                summary = _summarize_children(institution, node, group, common_keys)
+                summary_id = make_chunk_id(institution, summary["service_name"], SUMMARY_CHUNK, part)
+                chunks.append((summary, {
+                    "chunk_id": summary_id,
+                    "chunk_type": SUMMARY_CHUNK,
+                    "parent_id": parent_summary_id,
+                    "child_ids": [
+                        make_chunk_id(institution, record["service_name"], SERVICE_CHUNK, i)
+                        for child in group
+                        for i, record in enumerate(child["records"])
+                    ],
+                }))
+                covering_summary_ids.update({child["name"]: summary_id for child in group})
+
+        for i, record in enumerate(node["records"]):
+            chunks.append((record, {
+                "chunk_id": make_chunk_id(institution, record["service_name"], SERVICE_CHUNK, i),
+                "chunk_type": SERVICE_CHUNK,
+                "parent_id": parent_summary_id,
+                "child_ids": [],
+            }))
+
+        for name, child in node["children"].items():
+            visit(institution, child, covering_summary_ids.get(name))
+
+    for institution, root in build_service_tree(services).items():
+        visit(institution, root, None)
+
+    return chunks